@@ -58,4 +58,4 @@ class Neo4jClient:
             self.connect()
         return self.driver.session(**kwargs)
 
-db = Neo4jClient()
\ No newline at end of file
+db = Neo4jClient()
@@ -3,6 +3,8 @@ Database models and connection management for WikiGraph API
 """
 
 import sqlite3
+import gzip
+import ujson
 from contextlib import contextmanager
 from pathlib import Path
 from typing import List, Dict, Any, Optional
@@ -13,12 +15,13 @@ from config.language_manager import LanguageManager
 logger = logging.getLogger(__name__)
 
 @contextmanager
-def get_db_connection(db_path: Optional[Path] = None):
+def get_db_connection(db_path: Optional[Path] = None, read_only: bool = False):
     """
     Context manager for SQLite database connections.
 
     Args:
         db_path: Path to the SQLite database file. If None, uses default from project root.
+        read_only: Reject writes on this connection (PRAGMA query_only)
 
     Yields:
         sqlite3.Connection: Database connection
@@ -33,6 +36,14 @@ def get_db_connection(db_path: Optional[Path] = None):
         conn.execute("PRAGMA foreign_keys = ON")
         conn.execute("PRAGMA journal_mode = WAL")
         conn.execute("PRAGMA synchronous = NORMAL")
+        # Connections are opened per request, so the private page cache is thrown away on
+        # close: keep it small. mmap'd pages live in the OS page cache and are reused by the
+        # next connection (1 GiB stays under the default SQLITE_MAX_MMAP_SIZE cap of ~2 GB).
+        conn.execute("PRAGMA cache_size = -16384")  # 16 MB page cache
+        conn.execute("PRAGMA mmap_size = 1073741824")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        if read_only:
+            conn.execute("PRAGMA query_only = ON")
         yield conn
     except Exception as e:
         if conn:
@@ -97,6 +108,69 @@ def create_base_schema(db_path: Optional[Path] = None):
         conn.commit()
         logger.info("Base database schema created/verified")
 
+def import_articles(db_path: Optional[Path], lang: str, data_dir: Path,
+                    batch_size: int = 10000, commit_every: int = 100000) -> int:
+    """
+    Bulk-load parser output (articles_batch_*.jsonl.gz) into the articles table.
+
+    Rows are inserted with executemany inside large transactions, and the
+    articles indexes are dropped for the load and rebuilt afterwards.
+
+    Args:
+        db_path: Path to the SQLite database file
+        lang: Language code of the batches
+        data_dir: Directory holding the parser batches (data/processed/<lang>)
+        batch_size: Rows per executemany call
+        commit_every: Rows per transaction
+
+    Returns:
+        Number of rows submitted for insertion
+    """
+    insert_sql = """
+        INSERT OR IGNORE INTO articles
+            (id, language, title, revision_id, timestamp, categories, word_count, text_length)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """
+    article_files = sorted(Path(data_dir).glob("articles_batch_*.jsonl.gz"))
+
+    create_base_schema(db_path)
+    total = 0
+    try:
+        with get_db_connection(db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN")
+            cursor.execute("DROP INDEX IF EXISTS idx_articles_lang_title")
+            cursor.execute("DROP INDEX IF EXISTS idx_articles_title")
+            rows, uncommitted = [], 0
+            for path in article_files:
+                with gzip.open(path, 'rb') as f:
+                    for line in f:
+                        a = ujson.loads(line)
+                        rows.append((
+                            a['id'], lang, a['title'], a.get('revision_id'), a.get('timestamp'),
+                            ujson.dumps(a.get('categories', []), ensure_ascii=False),
+                            a.get('word_count'), a.get('text_length')
+                        ))
+                        if len(rows) >= batch_size:
+                            cursor.executemany(insert_sql, rows)
+                            total += len(rows)
+                            uncommitted += len(rows)
+                            rows = []
+                            if uncommitted >= commit_every:
+                                cursor.execute("COMMIT")
+                                cursor.execute("BEGIN")
+                                uncommitted = 0
+
+            if rows:
+                cursor.executemany(insert_sql, rows)
+                total += len(rows)
+            cursor.execute("COMMIT")
+    finally:
+        # Rebuild the indexes dropped above, also when the load fails partway
+        create_base_schema(db_path)
+    logger.info(f"Imported {total} {lang} articles from {len(article_files)} batches")
+    return total
+
 def initialize_fts_tables(db_path: Optional[Path] = None):
     """
     Create FTS5 virtual tables for full-text search if they don't exist.
@@ -107,6 +181,8 @@ def initialize_fts_tables(db_path: Optional[Path] = None):
     available_langs = LanguageManager.list_available_languages()
 
     with get_db_connection(db_path) as conn:
+        # FTS population writes a lot of WAL; truncate it after checkpoints instead of letting it grow
+        conn.execute("PRAGMA journal_size_limit = 6144000")
         cursor = conn.cursor()
 
         for lang in available_langs:
@@ -156,7 +232,7 @@ def search_articles(db_path: Path, query: str, lang: str,
     """
     fts_table = f"articles_fts_{lang}"
 
-    with get_db_connection(db_path) as conn:
+    with get_db_connection(db_path, read_only=True) as conn:
         cursor = conn.cursor()
 
         # Get total count
@@ -191,3 +267,13 @@ def search_articles(db_path: Path, query: str, lang: str,
         'total': total,
         'lang': lang
     }
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Import parser batches into the articles table")
+    parser.add_argument("--lang", required=True)
+    parser.add_argument("--data-dir", type=Path, default=None, help="Defaults to data/processed/<lang>")
+    parser.add_argument("--db", type=Path, default=None, help="Defaults to databases/wikigraph_multilang.db")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    import_articles(args.db, args.lang, args.data_dir or Path("data/processed") / args.lang)
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, HTTPException
 from app.database import db
+from app.routers.graph import clear_score_caches
 
 router = APIRouter()
 
@@ -29,6 +30,8 @@ def initialize_analytics():
             session.run(drop_query)
         
         session.run(project_query)
+        # PPR recommendations read this projection; cached results predate it
+        clear_score_caches()
         return {"status": "Graph projected successfully (Undirected)", "name": "wikigraph"}
 
 @router.post("/pagerank")
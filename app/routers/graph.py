@@ -1,8 +1,11 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import Dict, List, Optional
+from functools import lru_cache
 from app.database import db
 import logging
+import os
+import time
 
 # Configure router logging
 logger = logging.getLogger(__name__)
@@ -19,6 +22,19 @@ class WeightedNeighborsRequest(BaseModel):
 class BulkNeighborsRequest(BaseModel):
     requests: List[WeightedNeighborsRequest]
 
+# Memoized scores expire after this many seconds, so offline writes (precompute, an
+# incremental ingest) are picked up by every API worker without a restart
+SCORE_CACHE_TTL = int(os.getenv("SCORE_CACHE_TTL", 600))
+
+def _ttl_bucket() -> int:
+    """Extra cache-key component that changes every SCORE_CACHE_TTL seconds."""
+    return int(time.time() // SCORE_CACHE_TTL)
+
+def clear_score_caches():
+    """Drops this process's memoized neighbor/PPR results; call whenever the projection changes."""
+    _weighted_neighbors.cache_clear()
+    _ppr_recommendations.cache_clear()
+
 @router.get("/languages")
 def get_available_languages():
     """
@@ -78,11 +94,20 @@ def shortest_path(start: str, end: str, lang: str):
                 "hops": 0
             }
 
+    # The REPRESENTS hops at both ends are matched up front, so the BFS only expands
+    # LINKS_TO between Concepts; *0.. covers two articles of the same concept.
+    # Everything is OPTIONAL so a miss still returns one row: start_found tells a missing
+    # start article apart from "no path" without a second round-trip.
     query = """
-    MATCH (start:Article {title: $start, lang: $lang})
-    MATCH (end:Article {title: $end})
-    MATCH p = shortestPath((start)-[:REPRESENTS|LINKS_TO*]-(end))
-    RETURN [n in nodes(p) | {
+    OPTIONAL MATCH (start:Article {title: $start, lang: $lang})
+    OPTIONAL MATCH (start)-[:REPRESENTS]->(cs:Concept)
+    OPTIONAL MATCH (end:Article {title: $end})-[:REPRESENTS]->(ct:Concept)
+    OPTIONAL MATCH p = shortestPath((cs)-[:LINKS_TO*0..]-(ct))
+    WITH start, end, p
+    ORDER BY p IS NULL, length(p)
+    LIMIT 1
+    RETURN start IS NOT NULL as start_found,
+    CASE WHEN p IS NULL THEN null ELSE [n in [start] + nodes(p) + [end] | {
         label: labels(n)[0], 
         title: n.title, 
         qid: n.qid, 
@@ -91,28 +116,21 @@ def shortest_path(start: str, end: str, lang: str):
             WHEN 'Article' IN labels(n) THEN n.lang + ':' + n.qid 
             ELSE n.qid 
         END
-    }] as path, length(p) as hops
+    }] END as path, length(p) + 2 as hops
     """
     
     try:
         with db.get_session() as session:
             result = session.run(query, start=start, end=end, lang=lang).single() 
             
-        if not result:
-            # Check if nodes exist to give better error
-            check = "MATCH (a:Article {title: $title, lang: $lang}) RETURN count(a) as c"
-            with db.get_session() as session:
-                s_exists = session.run(check, title=start, lang=lang).single()['c'] > 0
-                e_exists = session.run(check, title=end, lang=lang).single()['c'] > 0 # Assumes end is same lang for now? No, end is ANY article.
-                # Actually query above didn't specify end lang.
+        if not result["start_found"]:
+            raise HTTPException(status_code=404, detail=f"Start article '{start}' ({lang}) not found")
             
-            if not s_exists:
-                raise HTTPException(status_code=404, detail=f"Start article '{start}' ({lang}) not found")
-            
-            # If nodes exist but no path
+        if result["path"] is None:
+            # Nodes exist (or end is missing) but no path
             raise HTTPException(status_code=404, detail="No path found between these articles")
             
-        return result.data()
+        return {"path": result["path"], "hops": result["hops"]}
     except HTTPException:
         raise
     except Exception as e:
@@ -191,28 +209,27 @@ def get_nebula_sample(langs: str = None, limit: int = 150):
 
     return {"nodes": combined_nodes, "links": links}
 
-@router.post("/weighted-neighbors")
-def get_weighted_neighbors(request: WeightedNeighborsRequest):
+@lru_cache(maxsize=10000)
+def _weighted_neighbors(qid: str, lang: Optional[str], limit: int, w_j: float, w_aa: float, w_ppr: float,
+                        ttl_bucket: int):
     """
-    Multi-algorithm neighbor scoring with user-defined weights.
-    Normalization: Min-Max normalization within the candidate set.
+    Scores depend only on the graph and the arguments, so repeat calls for the same
+    QID are served from memory for up to SCORE_CACHE_TTL seconds (ttl_bucket);
+    clear_score_caches() drops them when the API itself re-projects the graph.
+    Callers must copy the rows before handing them out.
     """
-    qid = request.qid
-    weights = request.weights
-    limit = request.limit
-    
     lang_filter = ""
     params = {
         "qid": qid,
-        "w_j": weights.get("jaccard", 0), 
-        "w_aa": weights.get("adamic_adar", 0), 
-        "w_ppr": weights.get("pagerank", 0),
+        "w_j": w_j, 
+        "w_aa": w_aa, 
+        "w_ppr": w_ppr,
         "limit": limit
     }
     
-    if request.lang:
+    if lang:
         lang_filter = "AND a.lang = $lang"
-        params["lang"] = request.lang
+        params["lang"] = lang
 
     
     # 1. Candidate Generation: Union of direct neighbors
@@ -279,20 +296,30 @@ def get_weighted_neighbors(request: WeightedNeighborsRequest):
     LIMIT $limit
     """
     
+    with db.get_session() as session:
+        return session.run(query, **params).data()
+
+@router.post("/weighted-neighbors")
+def get_weighted_neighbors(request: WeightedNeighborsRequest):
+    """
+    Multi-algorithm neighbor scoring with user-defined weights.
+    Normalization: Min-Max normalization within the candidate set.
+    """
+    weights = request.weights
     try:
-        with db.get_session() as session:
-            results = session.run(query, **params).data()
-            return {"center": qid, "neighbors": results}
+        results = _weighted_neighbors(
+            request.qid, request.lang, request.limit,
+            weights.get("jaccard", 0), weights.get("adamic_adar", 0), weights.get("pagerank", 0),
+            _ttl_bucket()
+        )
+        return {"center": request.qid, "neighbors": [dict(r) for r in results]}
     except Exception as e:
         logger.error(f"Weighted neighbors failed: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/recommendations")
-def get_recommendations(title: str, lang: str, limit: int = 5):
-    """
-    Personalized PageRank recommendations.
-    User MUST provide lang.
-    """
+@lru_cache(maxsize=10000)
+def _ppr_recommendations(title: str, lang: str, limit: int, ttl_bucket: int):
+    """Personalized PageRank top-(limit+1) for one article, memoized like _weighted_neighbors."""
     find_id_query = """
     MATCH (a:Article {title: $title, lang: $lang})-[:REPRESENTS]->(c:Concept)
     RETURN id(c) as nodeId
@@ -309,6 +336,14 @@ def get_recommendations(title: str, lang: str, limit: int = 5):
         if not node_record:
             raise HTTPException(status_code=404, detail="Article not found")
         source_id = node_record["nodeId"]
-        results = session.run(ppr_query, sourceNodeId=source_id, limit=limit + 1).data()
-    recommendations = [r for r in results if r["qid"] != results[0]["qid"]]
-    return {"seed": title, "recommendations": recommendations[:limit]}
\ No newline at end of file
+        return session.run(ppr_query, sourceNodeId=source_id, limit=limit + 1).data()
+
+@router.get("/recommendations")
+def get_recommendations(title: str, lang: str, limit: int = 5):
+    """
+    Personalized PageRank recommendations.
+    User MUST provide lang.
+    """
+    results = _ppr_recommendations(title, lang, limit, _ttl_bucket())
+    recommendations = [dict(r) for r in results if r["qid"] != results[0]["qid"]]
+    return {"seed": title, "recommendations": recommendations[:limit]}
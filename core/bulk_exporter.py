@@ -6,7 +6,7 @@ High-performance converter from Processed JSONL -> Neo4j Bulk Import CSVs.
 
 import csv
 import gzip
-import json
+import ujson
 import logging
 import sys
 from pathlib import Path
@@ -30,34 +30,10 @@ def load_qid_map(lang):
         qid_map_global = {row[0]: row[1] for row in reader}
     logging.info(f"✅ Loaded {len(qid_map_global):,} QIDs.")
 
-def build_title_map(article_files, lang):
-    """
-    Pass 1: Build Title -> QID map from all article batches.
-    """
-    global title_qid_map_global
-    logging.info(f"📚 Building Title -> QID map for {lang}...")
-    
-    count = 0
-    for f in tqdm(article_files, desc="Building Title Map"):
-        with gzip.open(f, 'rt', encoding='utf-8') as fin:
-            for line in fin:
-                try:
-                    data = json.loads(line)
-                    page_id = str(data['id'])
-                    # Resolve QID using the PageID map
-                    qid = qid_map_global.get(page_id, f"local:{lang}:{page_id}")
-                    
-                    # Store Title -> QID
-                    title_qid_map_global[data['title']] = qid
-                    count += 1
-                except json.JSONDecodeError:
-                    continue
-    logging.info(f"✅ Map built with {count:,} titles.")
-
 def process_files(lang, data_dir, output_dir):
     """
     Main processing logic:
-    1. Write Concepts & Articles (reading JSONL again)
+    1. Write Concepts & Articles, building the Title -> QID map in the same pass
     2. Write Links (reading CSVs and resolving via map)
     """
     
@@ -84,7 +60,7 @@ def process_files(lang, data_dir, output_dir):
     article_files = sorted(list(data_dir.glob("articles_batch_*.jsonl.gz")))
     link_files = sorted(list(data_dir.glob("links_batch_*.csv.gz")))
 
-    # --- PASS 1: NODES (Articles & Concepts) ---
+    # --- PASS 1: NODES (Articles & Concepts) + Title -> QID map ---
     logging.info("📝 Exporting Nodes (Concepts & Articles)...")
     seen_concepts = set()
     
@@ -92,10 +68,13 @@ def process_files(lang, data_dir, output_dir):
         with gzip.open(f, 'rt', encoding='utf-8') as fin:
             for line in fin:
                 try:
-                    data = json.loads(line)
+                    data = ujson.loads(line)
                     page_id = str(data['id'])
                     qid = qid_map_global.get(page_id, f"local:{lang}:{page_id}")
                     
+                    # Store Title -> QID for link resolution in pass 2
+                    title_qid_map_global[data['title']] = qid
+                    
                     # Write Concept (Unique)
                     if qid not in seen_concepts:
                         w_concepts.writerow([qid])
@@ -108,8 +87,9 @@ def process_files(lang, data_dir, output_dir):
                     # Write Edge: Article -> Concept
                     w_edges_rep.writerow([article_uuid, qid, "REPRESENTS"])
                     
-                except json.JSONDecodeError:
+                except ValueError:
                     continue
+    logging.info(f"✅ Map built with {len(title_qid_map_global):,} titles.")
 
     # --- PASS 2: EDGES (Links) ---
     logging.info("🔗 Exporting Links (Resolving Targets)...")
@@ -155,13 +135,7 @@ def main():
     # 1. Load PageID->QID Map
     load_qid_map(lang)
     
-    # 2. Build Title->QID Map (Pass 1)
-    # We re-scan the article files. Since they are compressed, reading them twice 
-    # is actually safer/easier than keeping 2GB of objects in memory if we just want the map.
-    article_files = sorted(list(data_dir.glob("articles_batch_*.jsonl.gz")))
-    build_title_map(article_files, lang)
-    
-    # 3. Process & Export (Pass 2)
+    # 2. Process & Export (the Title->QID map is filled during the node pass)
     process_files(lang, data_dir, output_dir)
     
     logging.info("✅ Bulk Export Complete.")
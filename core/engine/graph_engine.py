@@ -5,7 +5,7 @@ import random
 import logging
 import functools
 import gzip
-import json
+import ujson
 from pathlib import Path
 from neo4j import GraphDatabase
 from neo4j.exceptions import TransientError, ServiceUnavailable
@@ -130,7 +130,7 @@ class WikiGraphEngine:
         for f in article_files:
             with gzip.open(f, 'rt', encoding='utf-8') as fin:
                 for line in fin:
-                    data = json.loads(line)
+                    data = ujson.loads(line)
                     qid = get_qid_global(lang, data['id'])
                     title_qid_map_global[data['title']] = qid
                     count += 1
@@ -144,7 +144,7 @@ class WikiGraphEngine:
         if mode in ['articles', 'concepts']:
             with gzip.open(path, 'rt', encoding='utf-8') as f:
                 for line in f:
-                    data = json.loads(line)
+                    data = ujson.loads(line)
                     page_id = str(data['id'])
                     if mode == 'articles':
                         current_batch.append({
@@ -60,6 +60,15 @@ def get_db_connection(db_path):
     conn.execute("PRAGMA locking_mode = EXCLUSIVE;")
     return conn
 
+def get_readonly_connection(db_path):
+    """Read-only connection for the inspection tools: mmap-backed reads and a large page cache."""
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    conn.execute("PRAGMA mmap_size = 4294967296;")
+    conn.execute("PRAGMA cache_size = -524288;")
+    conn.execute("PRAGMA temp_store = MEMORY;")
+    conn.execute("PRAGMA query_only = ON;")
+    return conn
+
 def init_db(db_path):
     db_path.parent.mkdir(parents=True, exist_ok=True)
     conn = get_db_connection(db_path)
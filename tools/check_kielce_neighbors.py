@@ -4,6 +4,9 @@ import json
 
 API_URL = "http://localhost:8000/graph/neighbors"
 
+SESSION = requests.Session()
+SESSION.mount("http://", requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=0))
+
 def check_neighbors_api(qid):
     params = {
         "qid": qid,
@@ -13,7 +16,7 @@ def check_neighbors_api(qid):
     
     print(f"🔍 Calling API for {qid} (Kielce)...")
     try:
-        response = requests.get(API_URL, params=params)
+        response = SESSION.get(API_URL, params=params)
         response.raise_for_status()
         data = response.json()
         
@@ -1,12 +1,16 @@
-import sqlite3
 import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+from core.sqlite_loader import get_readonly_connection
 
 db_path = "data/db/pl.db"
-conn = sqlite3.connect(db_path)
+conn = get_readonly_connection(db_path)
 c = conn.cursor()
 
-total = c.execute('SELECT COUNT(*) FROM pages').fetchone()[0]
-redirects = c.execute('SELECT COUNT(*) FROM pages WHERE is_redirect=1').fetchone()[0]
+# Both counters in one scan of pages
+total, redirects = c.execute('SELECT COUNT(*), COALESCE(SUM(is_redirect = 1), 0) FROM pages').fetchone()
 
 print(f"Total Pages: {total}")
 print(f"Redirects:   {redirects}")
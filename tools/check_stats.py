@@ -1,15 +1,34 @@
+import argparse
 from app.database import db
 
-def check_stats():
-    query = """
-    MATCH (a:Article)
-    RETURN a.lang as lang, count(a) as count
-    ORDER BY count DESC
-    """
+# Written by tools/precompute_metrics.py: one node per language instead of touching every Article
+CACHED_QUERY = """
+MATCH (s:LangStat)
+RETURN s.lang as lang, s.count as count, s.updated as updated
+ORDER BY count DESC
+"""
+
+SCAN_QUERY = """
+MATCH (a:Article)
+RETURN a.lang as lang, count(a) as count
+ORDER BY count DESC
+"""
+
+def check_stats(cached=False):
     with db.get_session() as session:
-        res = session.run(query).data()
+        res = session.run(CACHED_QUERY).data() if cached else []
+        if res:
+            # Counts are as of the last precompute run, not necessarily the current graph
+            print(f"(cached by precompute_metrics at {res[0]['updated']})")
+        else:
+            if cached:
+                print("(no LangStat counts yet, counting live)")
+            res = session.run(SCAN_QUERY).data()
         for r in res:
             print(f"{r['lang']}: {r['count']}")
 
 if __name__ == "__main__":
-    check_stats()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cached", action="store_true", help="Read the LangStat counts from the last precompute run instead of scanning every Article")
+    args = parser.parse_args()
+    check_stats(cached=args.cached)
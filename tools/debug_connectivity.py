@@ -1,8 +1,12 @@
-import sqlite3
 import sys
+from itertools import count, islice
+from operator import itemgetter
 from pathlib import Path
 from mwsql import Dump
-from tqdm import tqdm
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+from core.sqlite_loader import get_readonly_connection
 
 def get_db_path(lang):
     return Path(f"data/db/{lang}.db")
@@ -17,7 +21,7 @@ def fix_encoding(text):
 
 def load_mappings(db_path):
     print("🧠 Loading metadata into memory...")
-    conn = sqlite3.connect(db_path)
+    conn = get_readonly_connection(db_path)
     cursor = conn.cursor()
     
     id_map = {} # id -> (qid, ns)
@@ -29,10 +33,9 @@ def load_mappings(db_path):
         JOIN id_mapping m ON p.page_id = m.page_id
     """)
     
-    for pid, ns, title, qid in tqdm(cursor, desc="Loading Maps"):
-        id_map[pid] = (qid, ns)
-        clean_title = title.replace(" ", "_")
-        title_map[(ns, clean_title)] = qid
+    while rows := cursor.fetchmany(50000):
+        id_map.update({pid: (qid, ns) for pid, ns, _, qid in rows})
+        title_map.update({(ns, title.replace(" ", "_")): qid for _, ns, title, qid in rows})
         
     conn.close()
     print(f"   Mapped {len(id_map)} entities.")
@@ -44,12 +47,11 @@ def debug_connectivity(lang="pl", limit=1000):
     
     # Load Redirects
     print("Loading Redirect Map...")
-    conn = sqlite3.connect(db_path)
+    conn = get_readonly_connection(db_path)
     cursor = conn.cursor()
-    cursor.execute("SELECT namespace, title FROM pages WHERE is_redirect=1")
-    redirect_set = set()
-    for ns, title in cursor:
-        redirect_set.add((ns, title.replace(" ", "_")))
+    # Titles are normalized to underscores by SQLite as rows are produced
+    cursor.execute("SELECT namespace, replace(title, ' ', '_') FROM pages WHERE is_redirect=1")
+    redirect_set = set(cursor)
     conn.close()
     print(f"   Loaded {len(redirect_set)} redirects.")
     
@@ -71,12 +73,9 @@ def debug_connectivity(lang="pl", limit=1000):
     
     detailed_log = []
     
-    for row in dump.rows():
-        stats["total_scanned"] += 1
-        # Sample 1/10000
-        if stats["total_scanned"] % 10000 != 0:
-            continue
-            
+    # Sample 1/10000: islice picks every 10000th row in C, and the zipped counter tracks the scan total
+    scanned = count(1)
+    for row in islice(map(itemgetter(0), zip(dump.rows(), scanned)), 9999, None, 10000):
         try:
             if len(row) < 3: continue
             stats["sampled"] += 1
@@ -108,6 +107,8 @@ def debug_connectivity(lang="pl", limit=1000):
             print(f"Error parsing row: {e}")
             continue
 
+    stats["total_scanned"] = next(scanned) - 1
+
     print("\n=== DIAGNOSTIC REPORT ===")
     print(f"Total Scanned: {stats['total_scanned']}")
     print(f"Total Sampled: {stats['sampled']}")
@@ -1,14 +1,24 @@
-from neo4j import GraphDatabase
 import sys
+from pathlib import Path
 
-uri = "bolt://localhost:7687"
-auth = ("neo4j", "wikigraph")
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+from app.database import db
+
+# Concept and its Articles in one round-trip: no row means the Concept is missing
+NODE_QUERY = """
+    MATCH (c:Concept {qid: $qid})
+    USING INDEX c:Concept(qid)
+    OPTIONAL MATCH (c)<-[:REPRESENTS]-(a:Article)
+    RETURN c.qid AS qid, collect(a {.title, .lang, .id}) AS articles
+"""
+
+def fetch_node(tx, qid):
+    return tx.run(NODE_QUERY, qid=qid).single()
 
 def check_node(qid):
-    driver = GraphDatabase.driver(uri, auth=auth)
-    with driver.session() as session:
-        # Check Concept
-        res = session.run("MATCH (c:Concept {qid: $qid}) RETURN c", qid=qid).single()
+    with db.get_session() as session:
+        res = session.execute_read(fetch_node, qid)
         if not res:
             print(f"❌ Concept {qid} NOT FOUND.")
             return
@@ -16,17 +26,14 @@ def check_node(qid):
         print(f"✅ Concept {qid} found.")
         
         # Check Articles
-        res = session.run("MATCH (c:Concept {qid: $qid})<-[:REPRESENTS]-(a:Article) RETURN a.title, a.lang, a.id", qid=qid)
-        articles = [r.data() for r in res]
+        articles = res["articles"]
         
         if not articles:
             print(f"⚠️  No Articles connected to {qid}!")
         else:
             print(f"📚 Connected Articles ({len(articles)}):")
             for a in articles:
-                print(f"   - [{a['a.lang']}] {a['a.title']} (ID: {a['a.id']})")
-
-    driver.close()
+                print(f"   - [{a['lang']}] {a['title']} (ID: {a['id']})")
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
@@ -6,55 +6,38 @@ Validation Gate 3: Diagnostic for Pagelinks Resolution
 - Reports precise success/failure rates.
 """
 
-import sqlite3
 import sys
+from itertools import count, islice
+from operator import itemgetter
 from pathlib import Path
 from mwsql import Dump
-from tqdm import tqdm
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+from core.sqlite_loader import get_readonly_connection
 
 def get_db_path(lang):
     return Path(f"data/db/{lang}.db")
 
-def load_mappings(db_path):
-    print("🧠 Loading metadata...")
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    
-    id_map = {}
-    title_map = {}
-    
-    cursor.execute("""
-        SELECT p.page_id, p.title, m.qid 
-        FROM pages p 
-        JOIN id_mapping m ON p.page_id = m.page_id
-        WHERE p.namespace = 0
-    """)
-    for pid, title, qid in cursor:
-        id_map[pid] = qid
-        clean_title = title.replace(" ", "_")
-        title_map[clean_title] = qid
-    
-    conn.close()
-    print(f"   Mapped {len(id_map)} source pages.")
-    return id_map, title_map
-
-def load_link_targets(db_path):
-    print("🎯 Loading Link Targets...")
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    # Loading ALL targets to debug NS mismatch, but map filtered for resolving
-    cursor.execute("SELECT lt_id, lt_namespace, lt_title FROM link_targets")
-    target_map = {}
-    for lt_id, lt_ns, lt_title in cursor:
-        target_map[lt_id] = (lt_ns, lt_title.replace(" ", "_"))
-    conn.close()
-    print(f"   Mapped {len(target_map)} targets (All Namespaces).")
-    return target_map
+# Sampled rows are resolved with point lookups (primary keys and idx_title) instead of whole-table dicts
+SOURCE_SQL = """
+    SELECT 1 FROM pages p
+    JOIN id_mapping m ON p.page_id = m.page_id
+    WHERE p.page_id = ? AND p.namespace = 0
+"""
+TARGET_SQL = "SELECT lt_namespace, lt_title FROM link_targets WHERE lt_id = ?"
+# Titles may be stored with spaces or underscores; link targets use underscores
+TITLE_SQL = """
+    SELECT m.qid FROM pages p
+    JOIN id_mapping m ON p.page_id = m.page_id
+    WHERE p.title IN (?, ?) AND p.namespace = 0
+    LIMIT 1
+"""
 
 def debug_resolution(lang="pl", sample_rate=10000):
     db_path = get_db_path(lang)
-    id_map, title_map = load_mappings(db_path)
-    target_map = load_link_targets(db_path)
+    conn = get_readonly_connection(db_path)
+    cursor = conn.cursor()
     
     pl_dump = Path(f"data/raw/{lang}wiki-latest-pagelinks.sql.gz")
     dump = Dump.from_file(str(pl_dump), encoding='latin1')
@@ -71,11 +54,9 @@ def debug_resolution(lang="pl", sample_rate=10000):
     
     print(f"\n🔍 Sampling 1 out of every {sample_rate} links...")
     
-    for row in dump.rows():
-        stats["total_scanned"] += 1
-        if stats["total_scanned"] % sample_rate != 0:
-            continue
-            
+    # islice picks every sample_rate-th row in C, and the zipped counter tracks the scan total
+    scanned = count(1)
+    for row in islice(map(itemgetter(0), zip(dump.rows(), scanned)), sample_rate - 1, None, sample_rate):
         if len(row) < 3: continue
         stats["sampled"] += 1
         
@@ -84,12 +65,12 @@ def debug_resolution(lang="pl", sample_rate=10000):
             target_id = int(row[2])
             
             # 1. Source Check
-            if src_id not in id_map:
+            if not cursor.execute(SOURCE_SQL, (src_id,)).fetchone():
                 stats["src_missing"] += 1
                 continue
                 
             # 2. Target ID Check
-            tgt_info = target_map.get(target_id)
+            tgt_info = cursor.execute(TARGET_SQL, (target_id,)).fetchone()
             if not tgt_info:
                 stats["tgt_missing_in_db"] += 1
                 continue
@@ -101,7 +82,8 @@ def debug_resolution(lang="pl", sample_rate=10000):
                 continue
                 
             # 3. Title Check
-            if tgt_title in title_map:
+            tgt_title = tgt_title.replace(" ", "_")
+            if cursor.execute(TITLE_SQL, (tgt_title, tgt_title.replace("_", " "))).fetchone():
                 stats["success"] += 1
             else:
                 stats["tgt_redlink"] += 1
@@ -109,6 +91,9 @@ def debug_resolution(lang="pl", sample_rate=10000):
         except Exception:
             continue
 
+    stats["total_scanned"] = next(scanned) - 1
+    conn.close()
+
     print("\n=== VALIDATION GATE 3 REPORT ===")
     print(f"Total Scanned: {stats['total_scanned']}")
     print(f"Total Sampled: {stats['sampled']}")
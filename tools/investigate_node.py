@@ -1,34 +1,40 @@
-from neo4j import GraphDatabase
 import sys
+from pathlib import Path
 
-uri = "bolt://localhost:7687"
-auth = ("neo4j", "wikigraph")
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+from app.database import db
+
+# Concept and its Articles in one round-trip: no row means the Concept is missing
+NODE_QUERY = """
+    MATCH (c:Concept {qid: $qid})
+    USING INDEX c:Concept(qid)
+    OPTIONAL MATCH (c)<-[:REPRESENTS]-(a:Article)
+    RETURN c.qid AS qid, collect(a {.id, .title, .lang}) AS articles
+"""
+
+def fetch_node(tx, qid):
+    return tx.run(NODE_QUERY, qid=qid).single()
 
 def check_problematic_node(qid):
-    driver = GraphDatabase.driver(uri, auth=auth)
-    with driver.session() as session:
+    with db.get_session() as session:
         print(f"🔍 Investigating {qid}...")
         
         # 1. Check Concept
-        c = session.run("MATCH (c:Concept {qid: $qid}) RETURN c", qid=qid).single()
+        c = session.execute_read(fetch_node, qid)
         if not c:
             print("❌ Concept not found.")
             return
         print("✅ Concept found.")
 
         # 2. Check Linked Articles
-        res = session.run("""
-            MATCH (c:Concept {qid: $qid})<-[:REPRESENTS]-(a:Article)
-            RETURN a.id, a.title, a.lang
-        """, qid=qid).data()
+        res = c["articles"]
         
         if not res:
             print("❌ No Articles connected!")
         else:
             for r in res:
-                print(f"📄 Article: ID={r['a.id']}, Lang={r['a.lang']}, Title='{r['a.title']}'")
-
-    driver.close()
+                print(f"📄 Article: ID={r['id']}, Lang={r['lang']}, Title='{r['title']}'")
 
 if __name__ == "__main__":
     check_problematic_node("Q131824731")
@@ -5,53 +5,75 @@ Library Test: mwsql (Phase 1, Gate 0) - Type Check
 
 import os
 import sys
+from itertools import islice
 from pathlib import Path
 from mwsql import Dump
 
-def test_pl_categories():
-    raw_dir = Path("data/raw")
-    lt_dump_path = raw_dir / "plwiki-latest-linktarget.sql.gz"
-    cl_dump_path = raw_dir / "plwiki-latest-categorylinks.sql.gz"
+# Category IDs seen in earlier runs; only looked up for the failure diagnostics
+SAMPLE_IDS = [1232641, 1621447, 1749534, 707271, 707275]
 
-    print("🎯 Loading linktarget dump...")
-    lt_dump = Dump.from_file(str(lt_dump_path), encoding='latin1')
+def iter_cl(path):
+    """categorylinks rows as (page_id, target_id)."""
+    for row in Dump.from_file(str(path), encoding='latin1').rows():
+        try:
+            # row: (from, sortkey, timestamp, prefix, type, collation, target_id)
+            yield row[0], int(row[6])
+        except (ValueError, IndexError):
+            continue
+
+def load_lt(path, wanted):
+    """Titles for the `wanted` lt_ids only; stops as soon as all of them are found."""
     lt_map = {}
-    
-    # We need to find the specific IDs used in categorylinks: 1232641, 1621447, etc.
-    # I'll just load all of them for Polish (it's small enough)
-    for row in lt_dump.rows():
+    if not wanted: return lt_map
+    for row in Dump.from_file(str(path), encoding='latin1').rows():
         try:
             lt_id = int(row[0])
-            lt_title = row[2]
-            lt_map[lt_id] = lt_title
+            if lt_id in wanted:
+                lt_map[lt_id] = row[2]
+                if len(lt_map) == len(wanted): break
         except (ValueError, IndexError):
             continue
-    print(f"   Loaded {len(lt_map)} link targets.")
+    return lt_map
 
-    print("🏷️ Loading categorylinks dump...")
-    cl_dump = Dump.from_file(str(cl_dump_path), encoding='latin1')
+def resolve_categories(cl_path, lt_path, want=10, window=100):
+    """
+    First `want` categorylinks rows whose target resolves, as (page_id, category_name).
+    categorylinks is read in windows (x10 each round); each window costs one linktarget
+    pass limited to that window's target IDs, so a single round is the usual case.
+    """
+    cl_rows = iter_cl(cl_path)
+    resolved, lt_map = [], {}
+    while len(resolved) < want:
+        batch = list(islice(cl_rows, window))
+        if not batch: break
+        lt_map.update(load_lt(lt_path, {target_id for _, target_id in batch} - lt_map.keys()))
+        for p_from, target_id in batch:
+            if target_id in lt_map:
+                resolved.append((p_from, lt_map[target_id]))
+                if len(resolved) >= want: break
+        window *= 10
+    return resolved, lt_map
+
+def test_pl_categories():
+    raw_dir = Path("data/raw")
+    lt_dump_path = raw_dir / "plwiki-latest-linktarget.sql.gz"
+    cl_dump_path = raw_dir / "plwiki-latest-categorylinks.sql.gz"
+
+    # categorylinks drives the scan: only the targets it references come out of linktarget
+    print("🏷️ Loading categorylinks + linktarget dumps...")
+    resolved, lt_map = resolve_categories(cl_dump_path, lt_dump_path)
+    print(f"   Loaded {len(lt_map)} link targets.")
     
     print("\n🔍 --- Success Criterion: Readable Categories ---")
-    found_count = 0
-    for row in cl_dump.rows():
-        try:
-            # row: (from, sortkey, timestamp, prefix, type, collation, target_id)
-            p_from = row[0]
-            target_id = int(row[6])
-            resolved_name = lt_map.get(target_id)
-            if resolved_name:
-                print(f"   ✅ [Page ID {p_from}] -> Category: {resolved_name}")
-                found_count += 1
-        except (ValueError, IndexError):
-            continue
-            
-        if found_count >= 10: break
+    for p_from, resolved_name in resolved:
+        print(f"   ✅ [Page ID {p_from}] -> Category: {resolved_name}")
+    found_count = len(resolved)
 
     if found_count == 0:
         print("   ❌ Could not resolve any category names.")
         # Debug: check why mapping failed
-        sample_ids = [1232641, 1621447, 1749534, 707271, 707275]
-        print(f"   Checking sample IDs in map: {[id in lt_map for id in sample_ids]}")
+        sample_map = load_lt(lt_dump_path, set(SAMPLE_IDS))
+        print(f"   Checking sample IDs in map: {[id in sample_map for id in SAMPLE_IDS]}")
     else:
         print(f"\n✅ Successfully resolved {found_count} category names.")
 
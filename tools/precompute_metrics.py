@@ -1,21 +1,23 @@
 #!/usr/bin/env python3
-from neo4j import GraphDatabase
 import os
+import sys
 import logging
 import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+from app.database import db
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger("precompute")
 
-uri = os.getenv("NEO4J_URI", "bolt://localhost:7687")
-user = os.getenv("NEO4J_USER", "neo4j")
-password = os.getenv("NEO4J_PASSWORD", "wikigraph")
+# GDS Community Edition rejects concurrency above 4; raise GDS_CONCURRENCY on an Enterprise license
+WORKERS = int(os.getenv("GDS_CONCURRENCY", min(os.cpu_count() or 4, 4)))
 
 def precompute():
-    driver = GraphDatabase.driver(uri, auth=(user, password))
-    
-    with driver.session() as session:
+    with db.get_session() as session:
         logger.info("🚀 Starting Batched Precomputation Pipeline...")
         
         # 1. Cleanup old state
@@ -34,6 +36,19 @@ def precompute():
             )
         """)
         
+        # 2b. Precompute Title Filters (list/date/category-like titles, checked once instead of per query)
+        logger.info("🏷️  Flagging list-like article titles (Batched)...")
+        session.run("""
+            CALL apoc.periodic.iterate(
+                "MATCH (a:Article) RETURN a",
+                "SET a.is_listish = (a.title =~ '^\\\\d+$' OR a.title =~ '^\\\\d+ .*'
+                    OR a.title STARTS WITH 'List of' OR a.title STARTS WITH 'Lista '
+                    OR a.title STARTS WITH 'Kategoria:' OR a.title STARTS WITH 'Category:'
+                    OR a.title CONTAINS 'Biografien')",
+                {batchSize: 5000, parallel: true}
+            )
+        """)
+        
         # 3. Create Basic Indexes
         logger.info("🔍 Creating primary indexes...")
         session.run("CREATE CONSTRAINT concept_qid_unique IF NOT EXISTS FOR (c:Concept) REQUIRE c.qid IS UNIQUE")
@@ -58,17 +73,23 @@ def precompute():
             CALL gds.pageRank.write('wikigraph_precompute', {
                 writeProperty: 'pagerank',
                 maxIterations: 30,
-                dampingFactor: 0.85
+                dampingFactor: 0.85,
+                tolerance: 0.0001,
+                concurrency: $n,
+                writeConcurrency: $n
             })
-        """)
+        """, n=WORKERS)
         
         # 6. Compute Louvain Communities
         logger.info("✍️  Writing Louvain Communities...")
         session.run("""
             CALL gds.louvain.write('wikigraph_precompute', {
-                writeProperty: 'community'
+                writeProperty: 'community',
+                tolerance: 0.0001,
+                concurrency: $n,
+                writeConcurrency: $n
             })
-        """)
+        """, n=WORKERS)
         
         # 7. Drop Projection
         logger.info("🧹 Dropping projection...")
@@ -86,34 +107,53 @@ def precompute():
         # 9. Create Materialized Cache (NodeCache)
         logger.info("💎 Creating Materialized Cache (NodeCache)...")
         # Step 1: Base Metadata
+        # Each Concept MERGEs its own NodeCache, so batches can run in parallel
         session.run("""
-            MATCH (c:HighRank)
-            WITH c LIMIT 500
-            MATCH (c)<-[:REPRESENTS]-(a:Article)
-            WITH c, a ORDER BY CASE WHEN a.lang = 'pl' THEN 1 WHEN a.lang = 'en' THEN 2 ELSE 3 END, size(a.title) DESC
-            WITH c, head(collect(a)) as main_article
-            MERGE (nc:NodeCache {qid: c.qid})
-            SET nc.name = main_article.title,
-                nc.lang = main_article.lang,
-                nc.val = c.pagerank,
-                nc.community = coalesce(c.community, -1)
+            CALL apoc.periodic.iterate(
+                "MATCH (c:HighRank) WITH c LIMIT 500 RETURN c",
+                "MATCH (c)<-[:REPRESENTS]-(a:Article)
+                 WITH c, a ORDER BY CASE WHEN a.lang = 'pl' THEN 1 WHEN a.lang = 'en' THEN 2 ELSE 3 END, size(a.title) DESC
+                 WITH c, head(collect(a)) as main_article
+                 MERGE (nc:NodeCache {qid: c.qid})
+                 SET nc.name = main_article.title,
+                     nc.lang = main_article.lang,
+                     nc.val = c.pagerank,
+                     nc.community = coalesce(c.community, -1)",
+                {batchSize: 100, parallel: true, concurrency: 4}
+            )
         """)
         
         logger.info("🔗 Pre-linking HighRank nodes in cache...")
         session.run("""
-            MATCH (nc:NodeCache)
-            MATCH (c:Concept {qid: nc.qid})
-            OPTIONAL MATCH (c)-[:LINKS_TO]-(neighbor:HighRank)
-            WITH nc, collect(DISTINCT neighbor.qid)[0..10] as neighbors
-            SET nc.neighbors = neighbors
+            CALL apoc.periodic.iterate(
+                "MATCH (nc:NodeCache) RETURN nc",
+                "MATCH (c:Concept {qid: nc.qid})
+                 OPTIONAL MATCH (c)-[:LINKS_TO]-(neighbor:HighRank)
+                 WITH nc, collect(DISTINCT neighbor.qid)[0..10] as neighbors
+                 SET nc.neighbors = neighbors",
+                {batchSize: 100, parallel: false}
+            )
         """)
         
         # 10. Create Cache Index
         session.run("CREATE INDEX node_cache_qid IF NOT EXISTS FOR (n:NodeCache) ON (n.qid)")
         
+        # 11. Per-language Article counts, timestamped (read by tools/check_stats.py --cached)
+        logger.info("📊 Caching per-language article counts...")
+        session.run("MATCH (s:LangStat) DELETE s")
+        session.run("""
+            MATCH (a:Article)
+            WHERE a.lang IS NOT NULL
+            WITH a.lang AS lang, count(*) AS c
+            MERGE (s:LangStat {lang: lang})
+            SET s.count = c, s.updated = datetime()
+        """)
+        
         logger.info("✅ Precomputation and Caching Complete!")
 
-    driver.close()
+    db.close()
+    # A running API keeps serving memoized scores until they expire (SCORE_CACHE_TTL)
+    logger.info("ℹ️  A running API picks up the new scores within SCORE_CACHE_TTL seconds.")
 
 if __name__ == "__main__":
     precompute()
\ No newline at end of file
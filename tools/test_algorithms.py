@@ -1,21 +1,29 @@
 import requests
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 API_BASE = "http://localhost:8000"
 TEST_QID = "Q170715" # Kielce
 ALGORITHMS = ["jaccard", "adamic_adar", "ppr"]
 
-def test_algo(algo):
-    print(f"--- Testing Algorithm: {algo} ---")
+SESSION = requests.Session()
+SESSION.mount("http://", requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=len(ALGORITHMS)))
+
+def fetch_algo(algo):
+    """Runs on a worker thread; the duration is measured per request."""
     start = time.time()
+    resp = SESSION.get(f"{API_BASE}/graph/neighbors", params={
+        "qid": TEST_QID,
+        "algorithm": algo,
+        "limit": 15,
+        "lang": "pl"
+    }, timeout=30)
+    return resp, time.time() - start
+
+def test_algo(algo, future):
+    print(f"--- Testing Algorithm: {algo} ---")
     try:
-        resp = requests.get(f"{API_BASE}/graph/neighbors", params={
-            "qid": TEST_QID,
-            "algorithm": algo,
-            "limit": 15,
-            "lang": "pl"
-        }, timeout=30)
-        duration = time.time() - start
+        resp, duration = future.result()
         if resp.status_code == 200:
             data = resp.json()
             print(f"Success! Found {len(data.get('neighbors', []))} neighbors in {duration:.2f}s")
@@ -28,5 +36,8 @@ def test_algo(algo):
     print("\n")
 
 if __name__ == "__main__":
-    for algo in ALGORITHMS:
-        test_algo(algo)
+    # All probes are in flight at once; results are still reported in ALGORITHMS order
+    with ThreadPoolExecutor(max_workers=len(ALGORITHMS)) as ex:
+        futures = [ex.submit(fetch_algo, algo) for algo in ALGORITHMS]
+        for algo, future in zip(ALGORITHMS, futures):
+            test_algo(algo, future)
@@ -1,21 +1,28 @@
 import requests
 import sys
 import json
+from concurrent.futures import ThreadPoolExecutor
 
 API_URL = "http://127.0.0.1:8000/graph/neighbors"
 QID = "Q102317" # Kielce
+ALGORITHMS = ["jaccard", "adamic_adar", "ppr"]
 
-def test_algo(algo_name):
-    print(f"\n--- Testing Algorithm: {algo_name.upper()} ---")
+SESSION = requests.Session()
+SESSION.mount("http://", requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=len(ALGORITHMS)))
+
+def fetch_algo(algo_name):
     params = {
         "qid": QID,
         "lang": "pl",
         "limit": 10,
         "algorithm": algo_name
     }
-    
+    return SESSION.get(API_URL, params=params, timeout=60) # Increased timeout
+
+def test_algo(algo_name, future):
+    print(f"\n--- Testing Algorithm: {algo_name.upper()} ---")
     try:
-        response = requests.get(API_URL, params=params, timeout=60) # Increased timeout
+        response = future.result()
         response.raise_for_status()
         data = response.json()
         
@@ -35,6 +42,8 @@ def test_algo(algo_name):
 
 if __name__ == "__main__":
     print(f"🔍 Comparing Ranking Algorithms for {QID} (Kielce)...")
-    test_algo("jaccard")
-    test_algo("adamic_adar")
-    test_algo("ppr")
+    # The three requests run concurrently; output stays in ALGORITHMS order
+    with ThreadPoolExecutor(max_workers=len(ALGORITHMS)) as ex:
+        futures = [ex.submit(fetch_algo, algo) for algo in ALGORITHMS]
+        for algo, future in zip(ALGORITHMS, futures):
+            test_algo(algo, future)
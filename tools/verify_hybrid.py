@@ -1,9 +1,16 @@
 import requests
 import json
+from urllib3.util.retry import Retry
 
 API_BASE = "http://localhost:8000"
 TEST_QID = "Q102317" # Kielce
 
+# weighted-neighbors only reads the graph, so a POST is safe to retry on gateway errors
+RETRY = Retry(total=3, backoff_factor=0.5, status_forcelist=[502, 503, 504], allowed_methods=["POST"])
+SESSION = requests.Session()
+SESSION.mount("http://", requests.adapters.HTTPAdapter(pool_connections=2, pool_maxsize=4, max_retries=RETRY))
+TIMEOUT = (5, 60) # connect, read
+
 def test_hybrid():
     print("Testing /graph/weighted-neighbors...")
     payload = {
@@ -15,7 +22,7 @@ def test_hybrid():
     }
     
     try:
-        resp = requests.post(f"{API_BASE}/graph/weighted-neighbors", json=payload)
+        resp = SESSION.post(f"{API_BASE}/graph/weighted-neighbors", json=payload, timeout=TIMEOUT)
         if resp.status_code == 200:
             print("✅ Success!")
             data = resp.json()
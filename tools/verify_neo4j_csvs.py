@@ -1,7 +1,80 @@
 #!/usr/bin/env python3
 import csv
+import io
+import mmap
+import re
 import sys
+from multiprocessing import Pool, cpu_count
 from pathlib import Path
+import pandas as pd
+
+RANGE_BYTES = 32 << 20 # per-task byte range; bounds each worker's DataFrame
+
+# Fast-path probes: a line matching these *might* be bad (quoted fields, blank lines and
+# real errors alike); clean files never match, so the full check runs only on a hit.
+# The \n prefix is the header's newline for the first data row.
+NODE_PROBE = re.compile(rb'\n[^Q]')
+EDGE_PROBE = re.compile(rb'\n(?:[^Q]|[^,\n]*,[^Q])')
+
+def read_header(path):
+    """First CSV row of path and the byte offset where the data rows start."""
+    with open(path, 'rb') as f:
+        header = next(csv.reader([f.readline().decode('utf-8')]))
+        return header, f.tell()
+
+def byte_ranges(path, data_start):
+    """Splits path after data_start into ~RANGE_BYTES ranges, each ending on a line boundary."""
+    size = path.stat().st_size
+    bounds = [data_start]
+    with open(path, 'rb') as f:
+        pos = data_start + RANGE_BYTES
+        while pos < size:
+            f.seek(pos)
+            f.readline() # advance to the next line start
+            pos = f.tell()
+            if pos >= size: break
+            bounds.append(pos)
+            pos += RANGE_BYTES
+    bounds.append(size)
+    return [(a, b) for a, b in zip(bounds, bounds[1:]) if a < b]
+
+def probe_csv(path, data_start, probe):
+    """Counts data rows with bytes.count over the mmap; returns (row_count, flagged)."""
+    if path.stat().st_size <= data_start:
+        return 0, False
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        size = len(mm)
+        newlines = sum(mm[pos:pos + RANGE_BYTES].count(b'\n') for pos in range(data_start, size, RANGE_BYTES))
+        row_count = newlines + (0 if mm[size - 1:] == b'\n' else 1)
+        return row_count, probe.search(mm, data_start - 1) is not None
+
+def bad_node_rows(df):
+    return ~df["qid:ID"].str.startswith("Q")
+
+def bad_edge_rows(df):
+    # Page IDs instead of QIDs
+    return df[":START_ID"].str.isdigit() | df[":END_ID"].str.isdigit()
+
+def _validate_range(task):
+    """Worker: parses one byte range as all-string columns; returns (row_count, first_bad_row)."""
+    path, start, end, columns, find_bad = task
+    with open(path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    df = pd.read_csv(io.BytesIO(data), header=None, names=columns, dtype=str, keep_default_na=False)
+    bad = find_bad(df)
+    return len(df), (df[bad].iloc[0].tolist() if bad.any() else None)
+
+def validate_parallel(path, columns, data_start, find_bad):
+    """Validates the data rows of path across all cores; returns (row_count, first_bad_row)."""
+    tasks = [(path, a, b, columns, find_bad) for a, b in byte_ranges(path, data_start)]
+    total = 0
+    with Pool(cpu_count()) as pool:
+        for rows, bad in pool.imap(_validate_range, tasks):
+            if bad is not None:
+                return total + rows, bad
+            total += rows
+    return total, None
 
 def verify():
     nodes_file = Path("data/neo4j_bulk/nodes.csv")
@@ -16,19 +89,18 @@ def verify():
         
     # 2. Verify Nodes
     print(f"📊 Verifying {nodes_file}...")
-    node_count = 0
-    with open(nodes_file, 'r', encoding='utf-8') as f:
-        reader = csv.reader(f)
-        header = next(reader)
-        if header != ["qid:ID", "ns:int", ":LABEL"]:
-            print(f"❌ FAIL: Invalid Node Header: {header}")
-            sys.exit(1)
-        
-        for row in reader:
-            node_count += 1
-            if not row[0].startswith("Q"):
-                print(f"❌ FAIL: Invalid QID format: {row[0]}")
-                sys.exit(1)
+    header, data_start = read_header(nodes_file)
+    if header != ["qid:ID", "ns:int", ":LABEL"]:
+        print(f"❌ FAIL: Invalid Node Header: {header}")
+        sys.exit(1)
+
+    node_count, flagged = probe_csv(nodes_file, data_start, NODE_PROBE)
+    bad = None
+    if flagged:
+        node_count, bad = validate_parallel(nodes_file, header, data_start, bad_node_rows)
+    if bad is not None:
+        print(f"❌ FAIL: Invalid QID format: {bad[0]}")
+        sys.exit(1)
                 
     print(f"✅ Nodes: {node_count:,} (Expected: ~1.6M)")
     if abs(node_count - 1675749) > 100:
@@ -36,24 +108,18 @@ def verify():
 
     # 3. Verify Edges
     print(f"📊 Verifying {edges_file}...")
-    edge_count = 0
-    with open(edges_file, 'r', encoding='utf-8') as f:
-        reader = csv.reader(f)
-        header = next(reader)
-        if header != [":START_ID", ":END_ID", ":TYPE"]:
-            print(f"❌ FAIL: Invalid Edge Header: {header}")
-            sys.exit(1)
-            
-        for row in reader:
-            edge_count += 1
-            # Check for IDs/Titles in the data
-            if row[0].isdigit() or row[1].isdigit():
-                print(f"❌ FAIL: Found Page IDs instead of QIDs: {row}")
-                sys.exit(1)
-            if "_" in row[0] or "_" in row[1]:
-                 # Some QIDs might have underscores? Usually not. Titles definitely do.
-                 # Let's check format.
-                 pass
+    header, data_start = read_header(edges_file)
+    if header != [":START_ID", ":END_ID", ":TYPE"]:
+        print(f"❌ FAIL: Invalid Edge Header: {header}")
+        sys.exit(1)
+
+    edge_count, flagged = probe_csv(edges_file, data_start, EDGE_PROBE)
+    bad = None
+    if flagged:
+        edge_count, bad = validate_parallel(edges_file, header, data_start, bad_edge_rows)
+    if bad is not None:
+        print(f"❌ FAIL: Found Page IDs instead of QIDs: {bad}")
+        sys.exit(1)
 
     print(f"✅ Edges: {edge_count:,} (Expected: >100M)")
     if edge_count < 100000: # Sanity check for the "77k failure"